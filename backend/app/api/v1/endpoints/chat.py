@@ -5,6 +5,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from app.services.socratic_tutor import tutor_service, ChatSession
+from app.services.knowledge_tracing import knowledge_store
 
 router = APIRouter()
 
@@ -42,12 +43,24 @@ async def send_message(req: ChatRequest):
         )
         _sessions[req.user_id] = session
 
+    # Per-concept mastery from the knowledge store; client text is the fallback
+    try:
+        session.knowledge_summary = knowledge_store.summary(req.user_id) or req.knowledge_summary
+    except Exception:
+        session.knowledge_summary = req.knowledge_summary
+
     try:
         result = await tutor_service.respond(session, req.message)
-        return ChatResponse(**result)
+        response = ChatResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    try:
+        knowledge_store.record_tutor_metadata(req.user_id, result.get("metadata"))
+    except Exception:
+        pass  # Non-blocking: the reply is already in the session history
+    return response
+
 
 @router.delete("/session/{user_id}")
 async def clear_session(user_id: str):
@@ -5,6 +5,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.irt_engine import irt_engine, IRTItem
+from app.services.knowledge_tracing import knowledge_store
 
 router = APIRouter()
 
@@ -16,6 +17,7 @@ DEMO_ITEMS: list[IRTItem] = [
     IRTItem("q4", "Ko'rsatkichlar","Matematika", difficulty=2.0,  discrimination=2.0),
     IRTItem("q5", "Logarifm",      "Matematika", difficulty=3.0,  discrimination=2.2),
 ]
+knowledge_store.register_concepts(item.concept for item in DEMO_ITEMS)
 
 
 class NextQuestionRequest(BaseModel):
@@ -56,6 +58,10 @@ def submit_answer(req: AnswerRequest):
     if not item:
         raise HTTPException(status_code=404, detail="Savol topilmadi.")
     result = irt_engine.update_theta(req.theta, item, req.is_correct)
+    try:
+        knowledge_store.record(req.user_id, item.concept, req.is_correct)
+    except Exception:
+        pass  # Non-blocking: the theta update is still returned
     return {
         "old_theta": round(result.old_theta, 3),
         "new_theta": round(result.new_theta, 3),
@@ -4,6 +4,7 @@
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from app.services.scanner import scanner_service
+from app.services.knowledge_tracing import knowledge_store
 
 router = APIRouter()
 
@@ -24,6 +25,11 @@ async def scan_homework(
 
     try:
         result = await scanner_service.process(image_bytes, user_id)
-        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        knowledge_store.record_scan_errors(user_id, result.get("analysis") or {})
+    except Exception:
+        pass  # Non-blocking: the scan result is still returned
+    return result
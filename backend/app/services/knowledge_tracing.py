@@ -0,0 +1,261 @@
+"""
+Knowledge Tracing Store — Bayesian Knowledge Tracing (BKT)
+Per-student, per-concept mastery held in a dense NumPy matrix.
+Evidence (quiz answers, tutor gap metadata, scan errors) is buffered
+write-behind per student and applied in vectorized batches; a read only
+flushes the reading student's pending rows.
+"""
+
+import re
+import threading
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+
+@dataclass
+class Observation:
+    user_id: str
+    concept: str
+    is_correct: bool
+
+
+class KnowledgeStore:
+    """
+    Array-backed BKT store.
+    Rows are students, columns are concepts; one row is a student's whole
+    concept vector, so reading or updating it is a single NumPy operation.
+    State lives in process memory only: it is lost on restart and not shared
+    between workers. Persisting to the `progress` table is not implemented.
+    Concepts are normalised (casefolded, parentheticals dropped, Uzbek
+    apostrophe variants unified). Registered concepts are seeded as columns;
+    unknown ones get new columns until MAX_CONCEPTS is reached. Columns are
+    labelled with the registered name, else with the normalised key.
+    """
+
+    P_INIT = 0.3      # P(L0): prior mastery
+    P_TRANSIT = 0.1   # P(T): learning after each opportunity
+    P_SLIP = 0.1      # P(S): wrong despite mastery
+    P_GUESS = 0.2     # P(G): right without mastery
+
+    FLUSH_SIZE = 64   # pending observations before an automatic flush
+    MASTERED = 0.7    # mastery at or above this counts as strong
+    SUMMARY_TOP_K = 3
+    GAP_TYPES = ("conceptual", "procedural", "factual")
+    MAX_CONCEPTS = 256
+
+    def __init__(self, initial_students: int = 64, initial_concepts: int = 32):
+        self._lock = threading.Lock()
+        self._students: dict[str, int] = {}
+        self._concepts: dict[str, int] = {}
+        self._concept_names: list[str] = []
+        self._mastery = np.full((initial_students, initial_concepts), self.P_INIT)
+        self._attempts = np.zeros((initial_students, initial_concepts), dtype=np.int32)
+        self._buffer: dict[str, list[Observation]] = {}
+        self._pending = 0
+        self._summary_cache: dict[str, str] = {}
+
+    # ------------------------------------------------------------------
+    # Ingestion (write-behind)
+    # ------------------------------------------------------------------
+    def register_concepts(self, names: Iterable[str]):
+        """Seed columns for known concepts (e.g. the quiz item bank)."""
+        with self._lock:
+            for name in names:
+                idx = self._concept_index(self._normalize(name))
+                if idx is not None:
+                    self._concept_names[idx] = name.strip()
+            self._summary_cache.clear()
+
+    def record(self, user_id: str, concept: str, is_correct: bool):
+        """Buffer a single observation; flushes once FLUSH_SIZE is reached."""
+        self.record_many([Observation(user_id, concept, is_correct)])
+
+    def record_many(self, observations: Iterable[Observation]):
+        """Buffer a batch of observations."""
+        with self._lock:
+            for o in observations:
+                key = self._normalize(o.concept)
+                if not key:
+                    continue
+                if self._concept_index(key) is None:
+                    continue
+                observation = Observation(o.user_id, key, o.is_correct)
+                self._buffer.setdefault(o.user_id, []).append(observation)
+                self._pending += 1
+            if self._pending >= self.FLUSH_SIZE:
+                self._flush_locked()
+
+    def record_tutor_metadata(self, user_id: str, metadata: Optional[dict]):
+        """Count a miss only when the tutor diagnosed a gap in the student's message."""
+        if not metadata or not metadata.get("concept"):
+            return
+        if metadata.get("gap_type") in self.GAP_TYPES:
+            self.record(user_id, str(metadata["concept"]), is_correct=False)
+
+    def record_scan_errors(self, user_id: str, analysis: dict):
+        """Each scan error counts as a failed opportunity on its concept."""
+        concepts = analysis.get("concepts")
+        fallback = concepts[0] if isinstance(concepts, list) and concepts else None
+        errors = analysis.get("errors")
+        batch = []
+        for err in errors if isinstance(errors, list) else []:
+            if not isinstance(err, dict):
+                continue
+            concept = err.get("concept") or fallback
+            if concept:
+                batch.append(Observation(user_id, str(concept), is_correct=False))
+        self.record_many(batch)
+
+    def flush(self):
+        """Apply all buffered observations to the mastery matrix."""
+        with self._lock:
+            self._flush_locked()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def mastery(self, user_id: str) -> dict[str, float]:
+        """Mastery probability for every concept the student has attempted."""
+        with self._lock:
+            self._flush_locked([user_id])
+            row = self._students.get(user_id)
+            if row is None:
+                return {}
+            n = len(self._concept_names)
+            seen = np.flatnonzero(self._attempts[row, :n])
+            values = self._mastery[row, seen]
+            return {self._concept_names[c]: float(v) for c, v in zip(seen, values)}
+
+    def summary(self, user_id: str) -> str:
+        """
+        Compact, cached knowledge summary for the Socratic prompt.
+        The cache serves turns that brought no new evidence for this student
+        (e.g. gap_type "none"); otherwise only their pending rows are applied
+        and the summary is rebuilt.
+        """
+        with self._lock:
+            self._flush_locked([user_id])
+            cached = self._summary_cache.get(user_id)
+            if cached is not None:
+                return cached
+            text = self._build_summary(user_id)
+            self._summary_cache[user_id] = text
+            return text
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _flush_locked(self, user_ids: Optional[Iterable[str]] = None):
+        if user_ids is None:
+            pending, self._buffer = self._buffer, {}
+        else:
+            pending = {u: self._buffer.pop(u) for u in user_ids if u in self._buffer}
+        batch = [o for observations in pending.values() for o in observations]
+        if not batch:
+            return
+        self._pending -= len(batch)
+
+        rows = np.array([self._student_index(o.user_id) for o in batch], dtype=np.intp)
+        cols = np.array([self._concepts[o.concept] for o in batch], dtype=np.intp)
+        correct = np.array([o.is_correct for o in batch], dtype=bool)
+
+        # BKT is order-dependent per (student, concept): apply the k-th
+        # observation of every pair in the same vectorized step.
+        keys = rows * self._mastery.shape[1] + cols
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_keys)) + 1]
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(sorted_keys)]))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order)) - group_start
+
+        for k in range(int(rank.max()) + 1):
+            step = rank == k
+            r, c = rows[step], cols[step]
+            self._mastery[r, c] = self._bkt_update(self._mastery[r, c], correct[step])
+
+        np.add.at(self._attempts, (rows, cols), 1)
+        for user_id in pending:
+            self._summary_cache.pop(user_id, None)
+
+    def _bkt_update(self, p: np.ndarray, correct: np.ndarray) -> np.ndarray:
+        """Posterior given the observation, then the learning transition."""
+        hit = p * (1.0 - self.P_SLIP)
+        miss = p * self.P_SLIP
+        posterior = np.where(
+            correct,
+            hit / (hit + (1.0 - p) * self.P_GUESS),
+            miss / (miss + (1.0 - p) * (1.0 - self.P_GUESS)),
+        )
+        return posterior + (1.0 - posterior) * self.P_TRANSIT
+
+    def _student_index(self, user_id: str) -> int:
+        idx = self._students.get(user_id)
+        if idx is None:
+            idx = self._students[user_id] = len(self._students)
+            if idx >= self._mastery.shape[0]:
+                self._grow(rows=self._mastery.shape[0] * 2)
+        return idx
+
+    def _concept_index(self, key: str) -> Optional[int]:
+        if not key:
+            return None
+        idx = self._concepts.get(key)
+        if idx is None:
+            if len(self._concept_names) >= self.MAX_CONCEPTS:
+                return None
+            idx = self._concepts[key] = len(self._concept_names)
+            self._concept_names.append(key)
+            if idx >= self._mastery.shape[1]:
+                self._grow(cols=min(self._mastery.shape[1] * 2, self.MAX_CONCEPTS))
+        return idx
+
+    @staticmethod
+    def _normalize(concept) -> str:
+        """'Kasrlar (qo'shish)', ' kasrlar ' and 'KASRLAR' share one column."""
+        text = re.sub(r"\(.*?\)", " ", str(concept))
+        text = re.sub(r"[ʻʼ‘’`]", "'", text)
+        return " ".join(text.split()).casefold()
+
+    def _grow(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        old_rows, old_cols = self._mastery.shape
+        rows, cols = rows or old_rows, cols or old_cols
+        mastery = np.full((rows, cols), self.P_INIT)
+        attempts = np.zeros((rows, cols), dtype=np.int32)
+        mastery[:old_rows, :old_cols] = self._mastery
+        attempts[:old_rows, :old_cols] = self._attempts
+        self._mastery, self._attempts = mastery, attempts
+
+    def _build_summary(self, user_id: str) -> str:
+        row = self._students.get(user_id)
+        if row is None:
+            return ""
+        n = len(self._concept_names)
+        seen = np.flatnonzero(self._attempts[row, :n])
+        if seen.size == 0:
+            return ""
+        values = self._mastery[row, seen]
+        ranked = seen[np.argsort(values, kind="stable")]
+        k = self.SUMMARY_TOP_K
+
+        def fmt(cols: np.ndarray) -> str:
+            return ", ".join(
+                f"{self._concept_names[c]} {self._mastery[row, c] * 100:.0f}%" for c in cols
+            )
+
+        is_strong = self._mastery[row, ranked] >= self.MASTERED
+        weak = ranked[~is_strong][:k]
+        strong = ranked[is_strong][::-1][:k]
+        parts = []
+        if weak.size:
+            parts.append(f"Weak: {fmt(weak)}")
+        if strong.size:
+            parts.append(f"Strong: {fmt(strong)}")
+        return " | ".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+knowledge_store = KnowledgeStore()
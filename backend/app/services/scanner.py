@@ -114,7 +114,7 @@ Return a JSON object ONLY:
   "grade_estimate": 7,
   "concepts": ["...", "..."],
   "errors": [
-    {{"type": "conceptual|procedural|factual", "description": "...", "location": "line N"}}
+    {{"type": "conceptual|procedural|factual", "concept": "...", "description": "...", "location": "line N"}}
   ],
   "difficulty_b": 0.5,
   "overall_assessment": "..."
@@ -0,0 +1,152 @@
+"""
+Tests for the array-backed BKT knowledge store.
+"""
+
+import random
+
+import pytest
+
+from app.services.knowledge_tracing import KnowledgeStore, Observation
+
+
+def sequential_bkt(store: KnowledgeStore, observations: list[Observation]) -> dict:
+    """Reference: scalar BKT applied one observation at a time."""
+    mastery: dict[tuple[str, str], float] = {}
+    for o in observations:
+        p = mastery.get((o.user_id, o.concept), store.P_INIT)
+        if o.is_correct:
+            hit = p * (1.0 - store.P_SLIP)
+            posterior = hit / (hit + (1.0 - p) * store.P_GUESS)
+        else:
+            miss = p * store.P_SLIP
+            posterior = miss / (miss + (1.0 - p) * (1.0 - store.P_GUESS))
+        mastery[(o.user_id, o.concept)] = posterior + (1.0 - posterior) * store.P_TRANSIT
+    return mastery
+
+
+@pytest.fixture
+def store() -> KnowledgeStore:
+    s = KnowledgeStore(initial_students=1, initial_concepts=1)
+    s.FLUSH_SIZE = 10_000
+    return s
+
+
+def test_batched_flush_matches_sequential_bkt(store):
+    rng = random.Random(26)
+    observations = [
+        Observation(f"s{rng.randrange(7)}", f"c{rng.randrange(5)}", rng.random() < 0.6)
+        for _ in range(300)
+    ]
+    store.record_many(observations)
+    store.flush()
+
+    expected = sequential_bkt(store, observations)
+    for (user_id, concept), p in expected.items():
+        assert store.mastery(user_id)[concept] == pytest.approx(p)
+
+
+def test_grow_preserves_values_across_both_axes(store):
+    store.record("s0", "c0", True)
+    store.flush()
+    before = store.mastery("s0")["c0"]
+
+    store.record_many(Observation(f"s{i}", f"c{i}", False) for i in range(1, 40))
+    store.flush()
+
+    rows, cols = store._mastery.shape
+    assert rows >= 40 and cols >= 40
+    assert store.mastery("s0") == {"c0": before}
+    expected = sequential_bkt(store, [Observation("s39", "c39", False)])
+    assert store.mastery("s39") == {"c39": pytest.approx(expected[("s39", "c39")])}
+
+
+def test_concept_columns_are_capped(store):
+    store.MAX_CONCEPTS = 3
+    store.record_many(Observation("s0", f"c{i}", True) for i in range(10))
+    assert set(store.mastery("s0")) == {"c0", "c1", "c2"}
+    assert store._mastery.shape[1] == 3
+
+
+def test_concepts_are_normalised_into_registered_columns(store):
+    store.register_concepts(["Kasrlar", "Ko'paytirish"])
+    store.record_many([
+        Observation("s0", "Kasrlar", True),
+        Observation("s0", " kasrlar ", True),
+        Observation("s0", "KASRLAR (qo'shish)", True),
+        Observation("s0", "Koʻpaytirish", True),
+        Observation("s0", "Ko’paytirish", True),
+    ])
+    store.flush()
+    row = store._students["s0"]
+    assert list(store._attempts[row, :2]) == [3, 2]
+
+
+def test_columns_are_labelled_by_key_or_registered_name(store):
+    store.record("s0", "Kasrlar (qo'shish)", False)
+    assert store.summary("s0") == "Weak: kasrlar 15%"
+
+    store.register_concepts(["Kasrlar"])
+    assert store.summary("s0") == "Weak: Kasrlar 15%"
+
+
+def test_tutor_and_scan_evidence_reach_a_seeded_store(store):
+    store.register_concepts(["Ko'paytirish", "Bo'lish", "Kasrlar", "Ko'rsatkichlar", "Logarifm"])
+    # Metadata as SocraticTutorService._extract_metadata parses it from a reply
+    for concept in ["Kasrlarni qo'shish", "Fractions", "Koʻpaytirish", "Chiziqli tenglamalar"]:
+        store.record_tutor_metadata("s0", {"gap_type": "procedural", "concept": concept, "step": 2})
+    store.record_scan_errors("s0", {
+        "subject": "Matematika",
+        "concepts": ["Algebra", "Quadratic equations"],
+        "errors": [
+            {"type": "procedural", "concept": "Quadratic equations",
+             "description": "Diskriminant noto'g'ri", "location": "line 3"},
+            {"type": "conceptual", "description": "Ishora xatosi", "location": "line 5"},
+        ],
+    })
+
+    assert set(store.mastery("s0")) == {
+        "kasrlarni qo'shish", "fractions", "Ko'paytirish", "chiziqli tenglamalar",
+        "quadratic equations", "algebra",
+    }
+
+
+def test_summary_splits_weak_and_strong(store):
+    store.record_many(
+        [Observation("s0", "A", True)] * 5
+        + [Observation("s0", "B", False)] * 3
+        + [Observation("s0", "C", False)]
+    )
+    assert store.summary("s0") == "Weak: b 11%, c 15% | Strong: a 100%"
+
+    store.record_many([Observation("s1", "A", False)])
+    assert store.summary("s1") == "Weak: a 15%"
+    assert store.summary("nobody") == ""
+
+
+def test_summary_cache_survives_other_students_evidence(store):
+    store.record("s0", "A", True)
+    first = store.summary("s0")
+    store.record("s1", "A", False)
+    assert store.summary("s0") is first
+    assert "s1" in store._buffer
+
+    store.record("s0", "A", True)
+    assert store.summary("s0") != first
+
+
+def test_tutor_metadata_counts_only_diagnosed_gaps(store):
+    for _ in range(6):
+        store.record_tutor_metadata("s0", {"gap_type": "none", "concept": "Kasrlar", "step": 1})
+    store.record_tutor_metadata("s0", {"concept": "Kasrlar"})
+    assert store.mastery("s0") == {}
+
+    store.record_tutor_metadata("s0", {"gap_type": "procedural", "concept": "Kasrlar"})
+    assert store.mastery("s0")["kasrlar"] < store.P_INIT
+
+
+def test_scan_errors_ignore_non_list_concepts(store):
+    store.record_scan_errors("s0", {"concepts": "Algebra", "errors": [{}]})
+    assert store.mastery("s0") == {}
+
+    store.record_scan_errors("s0", {"concepts": ["Algebra"], "errors": [{}, "bad"]})
+    assert list(store.mastery("s0")) == ["algebra"]